@@ -32,7 +32,7 @@ from sentry.sentry_metrics.utils import (
     resolve_tag_key,
 )
 from sentry.snuba.dataset import Dataset, EntityKey
-from sentry.snuba.metrics.fields import run_metrics_query
+from sentry.snuba.metrics.fields import bulk_run_metrics_query, run_metrics_query
 from sentry.snuba.metrics.fields.base import (
     SnubaDataType,
     get_derived_metrics,
@@ -67,6 +67,13 @@ from sentry.utils.snuba import raw_snql_query
 
 logger = logging.getLogger(__name__)
 
+_RELEASE_HEALTH_METRIC_TYPES: Tuple[MetricType, ...] = ("counter", "set", "distribution")
+_PERFORMANCE_METRIC_TYPES: Tuple[MetricType, ...] = (
+    "generic_counter",
+    "generic_set",
+    "generic_distribution",
+)
+
 
 def _get_metrics_for_entity(
     entity_key: EntityKey,
@@ -344,27 +351,22 @@ def _fetch_tags_or_values_for_mri(
     # entity by validating that the ids of the constituent metrics all lie in the same entity
     supported_metric_ids_in_entities = {}
 
-    release_health_metric_types = ("counter", "set", "distribution")
-    performance_metric_types = ("generic_counter", "generic_set", "generic_distribution")
-
     if use_case_id == UseCaseID.SESSIONS:
-        metric_types = release_health_metric_types
+        metric_types = _RELEASE_HEALTH_METRIC_TYPES
     else:
-        metric_types = performance_metric_types
-
-    for metric_type in metric_types:
-
-        entity_key = METRIC_TYPE_TO_ENTITY[metric_type]
-        rows = run_metrics_query(
-            entity_key=entity_key,
-            select=[Column("metric_id"), Column(column)],
-            where=where,
-            groupby=[Column("metric_id"), Column(column)],
-            referrer=referrer,
-            project_ids=[p.id for p in projects],
-            org_id=org_id,
-        )
+        metric_types = _PERFORMANCE_METRIC_TYPES
+
+    rows_per_metric_type = bulk_run_metrics_query(
+        entity_keys=[METRIC_TYPE_TO_ENTITY[metric_type] for metric_type in metric_types],
+        select=[Column("metric_id"), Column(column)],
+        where=where,
+        groupby=[Column("metric_id"), Column(column)],
+        referrer=referrer,
+        project_ids=[p.id for p in projects],
+        org_id=org_id,
+    )
 
+    for metric_type, rows in zip(metric_types, rows_per_metric_type):
         for row in rows:
             metric_id = row["metric_id"]
             if column.startswith(("tags[", "tags_raw[")):
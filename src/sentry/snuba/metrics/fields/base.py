@@ -3,8 +3,10 @@ from __future__ import annotations
 import copy
 import inspect
 from abc import ABC, abstractmethod
+from collections import deque
 from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
+from functools import cached_property
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -12,6 +14,7 @@ from typing import (
     Collection,
     Deque,
     Dict,
+    FrozenSet,
     Iterable,
     List,
     Mapping,
@@ -35,6 +38,8 @@ from sentry.sentry_metrics.utils import resolve_weak
 from sentry.snuba.dataset import Dataset, EntityKey
 from sentry.snuba.metrics.fields.histogram import ClickhouseHistogram, rebucket_histogram
 from sentry.snuba.metrics.fields.snql import (
+    METRIC_ID_COLUMN,
+    VALUE_COLUMN,
     abnormal_sessions,
     abnormal_users,
     addition,
@@ -87,13 +92,13 @@ from sentry.snuba.metrics.utils import (
     MetricType,
     NotSupportedOverCompositeEntityException,
     OrderByNotSupportedOverCompositeEntityException,
-    combine_dictionary_of_list_values,
 )
-from sentry.utils.snuba import raw_snql_query
+from sentry.utils.snuba import bulk_snql_query, raw_snql_query
 
 __all__ = (
     "metric_object_factory",
     "run_metrics_query",
+    "bulk_run_metrics_query",
     "MetricExpression",
     "MetricExpressionBase",
     "DerivedMetricExpression",
@@ -112,7 +117,7 @@ PostQueryFuncReturnType = Optional[Union[Tuple[Any, ...], ClickhouseHistogram, i
 MetricOperationParams = Mapping[str, Union[str, int, float]]
 
 
-def run_metrics_query(
+def _build_metrics_query_request(
     *,
     entity_key: EntityKey,
     select: List[Column],
@@ -120,10 +125,9 @@ def run_metrics_query(
     groupby: List[Column],
     project_ids: Sequence[int],
     org_id: int,
-    referrer: str,
     start: Optional[datetime] = None,
     end: Optional[datetime] = None,
-) -> List[SnubaDataType]:
+) -> Request:
     if end is None:
         end = datetime.now()
     if start is None:
@@ -147,16 +151,73 @@ def run_metrics_query(
         + where,
         granularity=Granularity(GRANULARITY),
     )
-    request = Request(
+    return Request(
         dataset=Dataset.Metrics.value,
         app_id="metrics",
         query=query,
         tenant_ids={"organization_id": org_id},
     )
+
+
+def run_metrics_query(
+    *,
+    entity_key: EntityKey,
+    select: List[Column],
+    where: List[Condition],
+    groupby: List[Column],
+    project_ids: Sequence[int],
+    org_id: int,
+    referrer: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[SnubaDataType]:
+    request = _build_metrics_query_request(
+        entity_key=entity_key,
+        select=select,
+        where=where,
+        groupby=groupby,
+        project_ids=project_ids,
+        org_id=org_id,
+        start=start,
+        end=end,
+    )
     result = raw_snql_query(request, referrer, use_cache=True)
     return result["data"]
 
 
+def bulk_run_metrics_query(
+    *,
+    entity_keys: Sequence[EntityKey],
+    select: List[Column],
+    where: List[Condition],
+    groupby: List[Column],
+    project_ids: Sequence[int],
+    org_id: int,
+    referrer: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[List[SnubaDataType]]:
+    """
+    Same as `run_metrics_query` but runs the query against each of the `entity_keys` in a single
+    bulk request to snuba, returning the data of each entity in the order of `entity_keys`.
+    """
+    requests = [
+        _build_metrics_query_request(
+            entity_key=entity_key,
+            select=select,
+            where=where,
+            groupby=groupby,
+            project_ids=project_ids,
+            org_id=org_id,
+            start=start,
+            end=end,
+        )
+        for entity_key in entity_keys
+    ]
+    results = bulk_snql_query(requests, referrer, use_cache=True)
+    return [result["data"] for result in results]
+
+
 def _get_known_entity_of_metric_mri(metric_mri: str) -> Optional[EntityKey]:
     # ToDo(ahmed): Add an abstraction that returns relevant data based on UseCaseID without repeating code
     try:
@@ -212,9 +273,9 @@ def _get_entity_of_metric_mri(
     for entity_key in entity_keys_set:
         data = run_metrics_query(
             entity_key=entity_key,
-            select=[Column("metric_id")],
-            where=[Condition(Column("metric_id"), Op.EQ, metric_id)],
-            groupby=[Column("metric_id")],
+            select=[METRIC_ID_COLUMN],
+            where=[Condition(METRIC_ID_COLUMN, Op.EQ, metric_id)],
+            groupby=[METRIC_ID_COLUMN],
             referrer=f"snuba.metrics.meta.get_entity_of_metric.{use_case_id.value}",
             project_ids=[p.id for p in projects],
             org_id=org_id,
@@ -232,6 +293,10 @@ def org_id_from_projects(projects: Sequence[Project]) -> int:
 
 @dataclass
 class MetricObjectDefinition:
+    # Raw metrics, raw ops and metric expressions are created for every field of every query, so
+    # the classes those are built from declare __slots__ to skip the per-instance __dict__
+    __slots__ = ("metric_mri",)
+
     metric_mri: str
 
 
@@ -247,6 +312,8 @@ class MetricObject(MetricObjectDefinition, ABC):
     the parentheses in an expression that looks like `sum(sentry.sessions.session)`
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def generate_filter_snql_conditions(self, org_id: int, use_case_id: UseCaseID) -> Function:
         raise NotImplementedError
@@ -262,13 +329,15 @@ class RawMetric(MetricObject):
     metric
     """
 
+    __slots__ = ()
+
     def generate_metric_ids(self, projects: Sequence[Project], use_case_id: UseCaseID) -> Set[int]:
         return {resolve_weak(use_case_id, org_id_from_projects(projects), self.metric_mri)}
 
     def generate_filter_snql_conditions(self, org_id: int, use_case_id: UseCaseID) -> Function:
         return Function(
             "equals",
-            [Column("metric_id"), resolve_weak(use_case_id, org_id, self.metric_mri)],
+            [METRIC_ID_COLUMN, resolve_weak(use_case_id, org_id, self.metric_mri)],
         )
 
 
@@ -286,7 +355,7 @@ class AliasedDerivedMetric(AliasedDerivedMetricDefinition, MetricObject):
             Function(
                 "equals",
                 [
-                    Column("metric_id"),
+                    METRIC_ID_COLUMN,
                     resolve_weak(use_case_id, org_id, self.raw_metric_mri),
                 ],
             )
@@ -299,10 +368,14 @@ class AliasedDerivedMetric(AliasedDerivedMetricDefinition, MetricObject):
 
 @dataclass
 class MetricOperationDefinition:
+    __slots__ = ("op",)
+
     op: MetricOperationType
 
 
 class MetricOperation(MetricOperationDefinition, ABC):
+    __slots__ = ()
+
     @abstractmethod
     def validate_can_orderby(self) -> None:
         raise NotImplementedError
@@ -359,6 +432,8 @@ class DerivedOpDefinition(MetricOperationDefinition):
 
 
 class RawOp(MetricOperation):
+    __slots__ = ()
+
     def validate_can_orderby(self) -> None:
         return
 
@@ -418,7 +493,7 @@ class RawOp(MetricOperation):
         else:
             snuba_function = OP_TO_SNUBA_FUNCTION[entity][self.op]
 
-        function = Function(snuba_function, [Column("value"), aggregate_filter], alias=alias)
+        function = Function(snuba_function, [VALUE_COLUMN, aggregate_filter], alias=alias)
 
         return self._wrap_quantiles(function, alias)
 
@@ -520,6 +595,8 @@ class DerivedOp(DerivedOpDefinition, MetricOperation):
 
 
 class MetricExpressionBase(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def validate_can_orderby(self) -> None:
         """
@@ -685,6 +762,8 @@ class MetricExpressionBase(ABC):
 
 @dataclass
 class MetricExpressionDefinition:
+    __slots__ = ("metric_operation", "metric_object")
+
     metric_operation: MetricOperation
     metric_object: MetricObject
 
@@ -696,6 +775,8 @@ class MetricExpression(MetricExpressionDefinition, MetricExpressionBase):
     conversions to SnQL away from the query builder.
     """
 
+    __slots__ = ()
+
     def __str__(self) -> str:
         return f"{self.metric_operation.op}({self.metric_object.metric_mri})"
 
@@ -867,6 +948,28 @@ class DerivedMetricExpression(DerivedMetricExpressionDefinition, MetricExpressio
     def get_meta_type(self) -> Optional[str]:
         return self.meta_type
 
+    @cached_property
+    def _raw_metric_mris(self) -> FrozenSet[str]:
+        """
+        The MRIs of the raw metrics (leaf nodes) in the dependency tree of this derived metric.
+        The tree is static, so it is only traversed once per instance
+        """
+        metric_mris: Set[str] = set()
+        # Derived metrics can share constituents (e.g. several session metrics are built on top of
+        # the same derived metric), so every node of the tree is only expanded once
+        visited: Set[str] = set()
+        stack = list(self.metrics)
+        while stack:
+            metric_mri = stack.pop()
+            if metric_mri in visited:
+                continue
+            visited.add(metric_mri)
+            if metric_mri in DERIVED_METRICS:
+                stack.extend(DERIVED_METRICS[metric_mri].metrics)
+            else:
+                metric_mris.add(metric_mri)
+        return frozenset(metric_mris)
+
 
 class SingularEntityDerivedMetric(DerivedMetricExpression):
     # Pretend for the typechecker that __init__ is not overridden, such that
@@ -886,33 +989,25 @@ class SingularEntityDerivedMetric(DerivedMetricExpression):
     def validate_can_orderby(self) -> None:
         return
 
-    @classmethod
-    def __recursively_get_all_entities_in_derived_metric_dependency_tree(
-        cls, derived_metric_mri: str, projects: Sequence[Project], use_case_id: UseCaseID
+    def __get_all_entities_in_derived_metric_dependency_tree(
+        self, projects: Sequence[Project], use_case_id: UseCaseID
     ) -> Set[MetricEntity]:
         """
-        Method that gets the entity of a derived metric by traversing down its dependency tree
-        until it gets to the raw metrics (leaf nodes) then queries snuba to check which
-        entity/entities these raw constituent metrics belong to.
+        Method that gets the entity of a derived metric by querying snuba to check which
+        entity/entities the raw metrics (leaf nodes) of its dependency tree belong to. Each raw
+        metric is only looked up once, even if it is reachable through several branches.
         """
-        if derived_metric_mri not in DERIVED_METRICS:
-            return {_get_entity_of_metric_mri(projects, derived_metric_mri, use_case_id).value}
-
-        entities = set()
-        derived_metric = DERIVED_METRICS[derived_metric_mri]
-
-        for metric_mri in derived_metric.metrics:
-            entities |= cls.__recursively_get_all_entities_in_derived_metric_dependency_tree(
-                metric_mri, projects, use_case_id
-            )
-        return entities
+        return {
+            _get_entity_of_metric_mri(projects, metric_mri, use_case_id).value
+            for metric_mri in self._raw_metric_mris
+        }
 
     def get_entity(self, projects: Sequence[Project], use_case_id: UseCaseID) -> MetricEntity:
         if not projects:
             self._raise_entity_validation_exception("get_entity")
         try:
-            entities = self.__recursively_get_all_entities_in_derived_metric_dependency_tree(
-                derived_metric_mri=self.metric_mri, projects=projects, use_case_id=use_case_id
+            entities = self.__get_all_entities_in_derived_metric_dependency_tree(
+                projects=projects, use_case_id=use_case_id
             )
         except InvalidParams:
             raise MetricDoesNotExistException()
@@ -925,27 +1020,33 @@ class SingularEntityDerivedMetric(DerivedMetricExpression):
         return entities.pop()
 
     @classmethod
-    def __recursively_generate_metric_ids(
-        cls, org_id: int, derived_metric_mri: str, use_case_id: UseCaseID
+    def __generate_metric_ids(
+        cls,
+        org_id: int,
+        derived_metric_mri: str,
+        use_case_id: UseCaseID,
+        resolved_metric_ids: Optional[MutableMapping[str, int]] = None,
     ) -> Set[int]:
         """
-        Method that traverses a derived metric dependency tree to return a set of the metric ids
-        of its constituent metrics
+        Method that returns a set of the metric ids of the raw constituent metrics of a derived
+        metric. Ids already present in `resolved_metric_ids` are not resolved again, and newly
+        resolved ones are added to it
         """
         if derived_metric_mri not in DERIVED_METRICS:
             return set()
-        derived_metric = DERIVED_METRICS[derived_metric_mri]
+        if resolved_metric_ids is None:
+            resolved_metric_ids = {}
+
         ids = set()
-        for metric_mri in derived_metric.metrics:
-            if metric_mri not in DERIVED_METRICS:
-                ids.add(resolve_weak(use_case_id, org_id, metric_mri))
-            else:
-                ids |= cls.__recursively_generate_metric_ids(org_id, metric_mri, use_case_id)
+        for metric_mri in DERIVED_METRICS[derived_metric_mri]._raw_metric_mris:
+            if metric_mri not in resolved_metric_ids:
+                resolved_metric_ids[metric_mri] = resolve_weak(use_case_id, org_id, metric_mri)
+            ids.add(resolved_metric_ids[metric_mri])
         return ids
 
     def generate_metric_ids(self, projects: Sequence[Project], use_case_id: UseCaseID) -> Set[int]:
         org_id = org_id_from_projects(projects)
-        return self.__recursively_generate_metric_ids(
+        return self.__generate_metric_ids(
             org_id, derived_metric_mri=self.metric_mri, use_case_id=use_case_id
         )
 
@@ -956,37 +1057,43 @@ class SingularEntityDerivedMetric(DerivedMetricExpression):
         org_id: int,
         derived_metric_mri: str,
         use_case_id: UseCaseID,
+        resolved_metric_ids: MutableMapping[str, int],
+        generated_snql: MutableMapping[str, List[Function]],
         alias: Optional[str] = None,
     ) -> List[Function]:
         """
-        Method that generates the SnQL representation for the derived metric
+        Method that generates the SnQL representation for the derived metric. The SnQL of
+        components, which is always aliased to their MRI, is kept in `generated_snql` so that a
+        component shared by several nodes of the dependency tree is only generated once
         """
         if derived_metric_mri not in DERIVED_METRICS:
             return []
+        if alias is None and derived_metric_mri in generated_snql:
+            return generated_snql[derived_metric_mri]
         derived_metric = DERIVED_METRICS[derived_metric_mri]
         arg_snql = []
         for arg in derived_metric.metrics:
             arg_snql += cls.__recursively_generate_select_snql(
-                project_ids, org_id, arg, use_case_id
+                project_ids, org_id, arg, use_case_id, resolved_metric_ids, generated_snql
             )
 
-        if alias is None:
-            # Aliases on components of SingularEntityDerivedMetric do not really matter as these evaluate to a single
-            # expression, and so what matters is the alias on that top level expression
-            alias = derived_metric_mri
-
         assert derived_metric.snql is not None
-        return [
+        snql = [
             derived_metric.snql(
                 *arg_snql,
                 project_ids=project_ids,
                 org_id=org_id,
-                metric_ids=cls.__recursively_generate_metric_ids(
-                    org_id, derived_metric_mri, use_case_id
+                metric_ids=cls.__generate_metric_ids(
+                    org_id, derived_metric_mri, use_case_id, resolved_metric_ids
                 ),
-                alias=alias,
+                # Aliases on components of SingularEntityDerivedMetric do not really matter as these evaluate to a
+                # single expression, and so what matters is the alias on that top level expression
+                alias=derived_metric_mri if alias is None else alias,
             )
         ]
+        if alias is None:
+            generated_snql[derived_metric_mri] = snql
+        return snql
 
     def generate_select_statements(
         self,
@@ -1012,6 +1119,10 @@ class SingularEntityDerivedMetric(DerivedMetricExpression):
             org_id=org_id,
             derived_metric_mri=self.metric_mri,
             use_case_id=use_case_id,
+            # Nodes of the dependency tree share components and raw metrics, so their SnQL and ids
+            # are only generated once while generating the SnQL of the whole tree
+            resolved_metric_ids={},
+            generated_snql={},
             alias=alias,
         )
 
@@ -1025,7 +1136,8 @@ class SingularEntityDerivedMetric(DerivedMetricExpression):
     ) -> List[OrderBy]:
         if not projects:
             self._raise_entity_validation_exception("generate_orderby_clause")
-        self.get_entity(projects=projects, use_case_id=use_case_id)
+        # `generate_select_statements` already validates that the constituents of this derived
+        # metric span a single entity
         return [
             OrderBy(
                 self.generate_select_statements(
@@ -1136,64 +1248,43 @@ class CompositeEntityDerivedMetric(DerivedMetricExpression):
     ) -> Dict[MetricEntity, List[str]]:
         if not projects:
             self._raise_entity_validation_exception("get_entity")
-        return self.__recursively_generate_singular_entity_constituents(
-            projects=projects, derived_metric_obj=self, use_case_id=use_case_id
-        )
+        entities_and_metric_mris: Dict[MetricEntity, List[str]] = {}
+        for metric_mri in self._singular_entity_constituent_mris:
+            entity = DERIVED_METRICS[metric_mri].get_entity(
+                projects=projects, use_case_id=use_case_id
+            )
+            entities_and_metric_mris.setdefault(entity, []).append(metric_mri)
+        return entities_and_metric_mris
 
     def generate_available_operations(self) -> Collection[MetricOperation]:
         return []
 
-    @classmethod
-    def __recursively_generate_singular_entity_constituents(
-        cls,
-        projects: Optional[Sequence[Project]],
-        derived_metric_obj: DerivedMetricExpression,
-        use_case_id: UseCaseID,
-        is_naive: bool = False,
-    ) -> Dict[MetricEntity, List[str]]:
-        entities_and_metric_mris: Dict[MetricEntity, List[str]] = {}
-        for metric_mri in derived_metric_obj.metrics:
+    @cached_property
+    def _singular_entity_constituent_mris(self) -> Tuple[str, ...]:
+        """
+        The MRIs of the instances of SingularEntityDerivedMetric this metric is computed from, in
+        the order they are found walking down its dependency tree. The tree is static, so it is
+        only traversed once per instance
+        """
+        constituent_mris: List[str] = []
+        for metric_mri in self.metrics:
             if metric_mri not in DERIVED_METRICS:
                 continue
             constituent_metric_obj = DERIVED_METRICS[metric_mri]
             if isinstance(constituent_metric_obj, SingularEntityDerivedMetric):
-                if is_naive:
-                    entity = None
-                else:
-                    assert projects is not None
-                    entity = constituent_metric_obj.get_entity(
-                        projects=projects, use_case_id=use_case_id
-                    )
-
-                entities_and_metric_mris.setdefault(entity, []).append(
-                    constituent_metric_obj.metric_mri
-                )
                 # We do not care about the components of a SingularEntityDerivedMetric
-                continue
-
-            # This is necessary because we don't want to override entity lists but rather append
-            # to them
-            entities_and_metric_mris = combine_dictionary_of_list_values(
-                entities_and_metric_mris,
-                cls.__recursively_generate_singular_entity_constituents(
-                    projects, constituent_metric_obj, use_case_id, is_naive
-                ),
-            )
-
-        return entities_and_metric_mris
-
-    def generate_bottom_up_derived_metrics_dependencies(
-        self, alias: str
-    ) -> Iterable[Tuple[Optional[MetricOperationType], str, str]]:
-        # We are only interested in the dependency tree from instances of
-        # CompositeEntityDerivedMetric as they don't have a direct mapping to SnQL and so
-        # need to be computed post query which is practically when this function is called
-        from collections import deque
-
-        # Flag set to identify the root or the parent as it is the only node that receives the alias as while all child
-        # nodes receive the suffix `__CHILD_OF__<parent_alias>`
-        set_alias_root = False
+                constituent_mris.append(constituent_metric_obj.metric_mri)
+            else:
+                constituent_mris.extend(constituent_metric_obj._singular_entity_constituent_mris)
+        return tuple(dict.fromkeys(constituent_mris))
 
+    @cached_property
+    def _bottom_up_dependency_mris(self) -> Tuple[str, ...]:
+        """
+        The MRIs of the derived metrics in the dependency tree of this metric, bottom up, so that
+        every metric comes after its constituents. The tree is static, so it is only traversed once
+        per instance
+        """
         metric_nodes: Deque[DerivedMetricExpression] = deque()
 
         results = []
@@ -1201,17 +1292,7 @@ class CompositeEntityDerivedMetric(DerivedMetricExpression):
         while metric_nodes:
             node = metric_nodes.popleft()
             if node.metric_mri in DERIVED_METRICS:
-                if set_alias_root:
-                    results.append(
-                        (
-                            None,
-                            node.metric_mri,
-                            f"{node.metric_mri}{COMPOSITE_ENTITY_CONSTITUENT_ALIAS}{alias}",
-                        )
-                    )
-                else:
-                    results.append((None, node.metric_mri, alias))
-                    set_alias_root = True
+                results.append(node.metric_mri)
 
                 # We do not really care about getting the components of an instance of
                 # SingularEntityDerivedMetric because there is a direct mapping to the response
@@ -1221,17 +1302,28 @@ class CompositeEntityDerivedMetric(DerivedMetricExpression):
             for metric in node.metrics:
                 if metric in DERIVED_METRICS:
                     metric_nodes.append(DERIVED_METRICS[metric])
-        return reversed(results)
+        return tuple(reversed(results))
+
+    def generate_bottom_up_derived_metrics_dependencies(
+        self, alias: str
+    ) -> Iterable[Tuple[Optional[MetricOperationType], str, str]]:
+        # We are only interested in the dependency tree from instances of
+        # CompositeEntityDerivedMetric as they don't have a direct mapping to SnQL and so
+        # need to be computed post query which is practically when this function is called
+        metric_mris = self._bottom_up_dependency_mris
+        if not metric_mris:
+            return []
+
+        # The root or the parent is the only node that receives the alias while all child nodes
+        # receive the suffix `__CHILD_OF__<parent_alias>`
+        *child_mris, root_mri = metric_mris
+        return [
+            (None, metric_mri, f"{metric_mri}{COMPOSITE_ENTITY_CONSTITUENT_ALIAS}{alias}")
+            for metric_mri in child_mris
+        ] + [(None, root_mri, alias)]
 
     def naively_generate_singular_entity_constituents(self, use_case_id: UseCaseID) -> Set[str]:
-        single_entity_constituents = set(
-            list(
-                self.__recursively_generate_singular_entity_constituents(
-                    projects=None, derived_metric_obj=self, use_case_id=use_case_id, is_naive=True
-                ).values()
-            ).pop()
-        )
-        return single_entity_constituents
+        return set(self._singular_entity_constituent_mris)
 
     def run_post_query_function(
         self,
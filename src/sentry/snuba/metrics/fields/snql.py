@@ -20,13 +20,18 @@ from sentry.snuba.metrics.naming_layer.public import (
     TransactionTagsKey,
 )
 
+# snuba_sdk columns are immutable and validate their name on creation, so the columns used by every
+# metric aggregate are built once and shared
+METRIC_ID_COLUMN = Column("metric_id")
+VALUE_COLUMN = Column("value")
+
 
 def _aggregation_on_session_status_func_factory(aggregate):
     def _snql_on_session_status_factory(org_id, session_status, metric_ids, alias=None):
         return Function(
             aggregate,
             [
-                Column("value"),
+                VALUE_COLUMN,
                 Function(
                     "and",
                     [
@@ -43,7 +48,7 @@ def _aggregation_on_session_status_func_factory(aggregate):
                                 resolve_tag_value(UseCaseID.SESSIONS, org_id, session_status),
                             ],
                         ),
-                        Function("in", [Column("metric_id"), list(metric_ids)]),
+                        Function("in", [METRIC_ID_COLUMN, list(metric_ids)]),
                     ],
                 ),
             ],
@@ -53,6 +58,12 @@ def _aggregation_on_session_status_func_factory(aggregate):
     return _snql_on_session_status_factory
 
 
+# The aggregation closures don't depend on the request, so they are built once at import time
+# instead of on every call of the derived metric snql functions below.
+_counter_sum_on_session_status = _aggregation_on_session_status_func_factory(aggregate="sumIf")
+_set_uniq_on_session_status = _aggregation_on_session_status_func_factory(aggregate="uniqIf")
+
+
 def _aggregation_on_abnormal_mechanism_func_factory(
     org_id, abnormal_mechanism, metric_ids, alias=None
 ):
@@ -91,12 +102,12 @@ def _aggregation_on_abnormal_mechanism_func_factory(
     return Function(
         "uniqIf",
         [
-            Column("value"),
+            VALUE_COLUMN,
             Function(
                 "and",
                 [
                     abnormal_mechanism_condition,
-                    Function("in", [Column("metric_id"), list(metric_ids)]),
+                    Function("in", [METRIC_ID_COLUMN, list(metric_ids)]),
                 ],
             ),
         ],
@@ -107,22 +118,18 @@ def _aggregation_on_abnormal_mechanism_func_factory(
 def _counter_sum_aggregation_on_session_status_factory(
     org_id: int, session_status, metric_ids, alias=None
 ):
-    return _aggregation_on_session_status_func_factory(aggregate="sumIf")(
-        org_id, session_status, metric_ids, alias
-    )
+    return _counter_sum_on_session_status(org_id, session_status, metric_ids, alias)
 
 
 def _set_uniq_aggregation_on_session_status_factory(
     org_id: int, session_status, metric_ids, alias=None
 ):
-    return _aggregation_on_session_status_func_factory(aggregate="uniqIf")(
-        org_id, session_status, metric_ids, alias
-    )
+    return _set_uniq_on_session_status(org_id, session_status, metric_ids, alias)
 
 
 def _aggregation_on_tx_status_func_factory(aggregate):
     def _get_snql_conditions(org_id, metric_ids, exclude_tx_statuses):
-        metric_match = Function("in", [Column("metric_id"), list(metric_ids)])
+        metric_match = Function("in", [METRIC_ID_COLUMN, list(metric_ids)])
         assert exclude_tx_statuses is not None
         if len(exclude_tx_statuses) == 0:
             return metric_match
@@ -155,7 +162,7 @@ def _aggregation_on_tx_status_func_factory(aggregate):
         return Function(
             aggregate,
             [
-                Column("value"),
+                VALUE_COLUMN,
                 _get_snql_conditions(org_id, metric_ids, exclude_tx_statuses),
             ],
             alias,
@@ -164,12 +171,13 @@ def _aggregation_on_tx_status_func_factory(aggregate):
     return _snql_on_tx_status_factory
 
 
+_dist_count_on_tx_status = _aggregation_on_tx_status_func_factory("countIf")
+
+
 def _dist_count_aggregation_on_tx_status_factory(
     org_id, exclude_tx_statuses: List[str], metric_ids, alias=None
 ):
-    return _aggregation_on_tx_status_func_factory("countIf")(
-        org_id, exclude_tx_statuses, metric_ids, alias
-    )
+    return _dist_count_on_tx_status(org_id, exclude_tx_statuses, metric_ids, alias)
 
 
 def _aggregation_on_tx_satisfaction_func_factory(aggregate):
@@ -177,7 +185,7 @@ def _aggregation_on_tx_satisfaction_func_factory(aggregate):
         return Function(
             aggregate,
             [
-                Column("value"),
+                VALUE_COLUMN,
                 Function(
                     "and",
                     [
@@ -196,7 +204,7 @@ def _aggregation_on_tx_satisfaction_func_factory(aggregate):
                                 ),
                             ],
                         ),
-                        Function("in", [Column("metric_id"), list(metric_ids)]),
+                        Function("in", [METRIC_ID_COLUMN, list(metric_ids)]),
                     ],
                 ),
             ],
@@ -206,18 +214,20 @@ def _aggregation_on_tx_satisfaction_func_factory(aggregate):
     return _snql_on_tx_satisfaction_factory
 
 
+_dist_count_on_tx_satisfaction = _aggregation_on_tx_satisfaction_func_factory("countIf")
+_set_count_on_tx_satisfaction = _aggregation_on_tx_satisfaction_func_factory("uniqIf")
+
+
 def _dist_count_aggregation_on_tx_satisfaction_factory(
     org_id, satisfaction: str, metric_ids, alias=None
 ):
-    return _aggregation_on_tx_satisfaction_func_factory("countIf")(
-        org_id, satisfaction, metric_ids, alias
-    )
+    return _dist_count_on_tx_satisfaction(org_id, satisfaction, metric_ids, alias)
 
 
 def _set_count_aggregation_on_tx_satisfaction_factory(
     org_id, satisfaction: str, metric_ids, alias=None
 ):
-    return _aggregation_on_tx_satisfaction_func_factory("uniqIf")(
+    return _set_count_on_tx_satisfaction(
         org_id=org_id,
         satisfaction_value=satisfaction,
         metric_ids=metric_ids,
@@ -293,11 +303,11 @@ def uniq_aggregation_on_metric(metric_ids, alias=None):
     return Function(
         "uniqIf",
         [
-            Column("value"),
+            VALUE_COLUMN,
             Function(
                 "in",
                 [
-                    Column("metric_id"),
+                    METRIC_ID_COLUMN,
                     list(metric_ids),
                 ],
             ),
@@ -342,12 +352,12 @@ def http_error_count_transaction(org_id, metric_ids, alias=None):
     return Function(
         "countIf",
         [
-            Column("value"),
+            VALUE_COLUMN,
             Function(
                 "and",
                 [
                     base_condition,
-                    Function("in", [Column("metric_id"), list(metric_ids)]),
+                    Function("in", [METRIC_ID_COLUMN, list(metric_ids)]),
                 ],
             ),
         ],
@@ -402,7 +412,7 @@ def _metric_id_equivalence(metric_condition: Function) -> Function:
     return Function(
         "equals",
         [
-            Column("metric_id"),
+            METRIC_ID_COLUMN,
             metric_condition,
         ],
     )
@@ -425,7 +435,7 @@ def _count_if_with_conditions(
     return Function(
         "countIf",
         [
-            Column("value"),
+            VALUE_COLUMN,
             _generate_conditions(conditions),
         ],
         alias,
@@ -553,7 +563,7 @@ def histogram_snql_factory(
 
     return Function(
         f"histogramIf({MAX_HISTOGRAM_BUCKET})",
-        [Column("value"), conditions],
+        [VALUE_COLUMN, conditions],
         alias=alias,
     )
 
@@ -562,7 +572,7 @@ def rate_snql_factory(aggregate_filter, numerator, denominator=1.0, alias=None):
     return Function(
         "divide",
         [
-            Function("countIf", [Column("value"), aggregate_filter]),
+            Function("countIf", [VALUE_COLUMN, aggregate_filter]),
             Function("divide", [numerator, denominator]),
         ],
         alias=alias,
@@ -573,7 +583,7 @@ def count_web_vitals_snql_factory(aggregate_filter, org_id, measurement_rating,
     return Function(
         "countIf",
         [
-            Column("value"),
+            VALUE_COLUMN,
             Function(
                 "and",
                 [
@@ -644,7 +654,7 @@ def count_transaction_name_snql_factory(aggregate_filter, org_id, transaction_na
     return Function(
         "countIf",
         [
-            Column("value"),
+            VALUE_COLUMN,
             Function(
                 "and",
                 [aggregate_filter, transaction_name_filter],
@@ -701,7 +711,7 @@ def operation_if_column_snql(
     return Function(
         operation,
         [
-            Column("value"),
+            VALUE_COLUMN,
             Function(
                 "and",
                 [
@@ -758,7 +768,7 @@ def on_demand_failure_rate_snql_factory(aggregate_filter, org_id, use_case_id, a
             Function(
                 "countIf",
                 [
-                    Column("value"),
+                    VALUE_COLUMN,
                     Function(
                         "and",
                         [
@@ -774,7 +784,7 @@ def on_demand_failure_rate_snql_factory(aggregate_filter, org_id, use_case_id, a
                     ),
                 ],
             ),
-            Function("countIf", [Column("value"), aggregate_filter]),
+            Function("countIf", [VALUE_COLUMN, aggregate_filter]),
         ],
         alias=alias,
     )
@@ -786,7 +796,7 @@ def on_demand_apdex_snql_factory(aggregate_filter, org_id, use_case_id, alias=No
     satisfactory = Function(
         "countIf",
         [
-            Column("value"),
+            VALUE_COLUMN,
             Function(
                 "and",
                 [
@@ -808,7 +818,7 @@ def on_demand_apdex_snql_factory(aggregate_filter, org_id, use_case_id, alias=No
             Function(
                 "countIf",
                 [
-                    Column("value"),
+                    VALUE_COLUMN,
                     Function(
                         "and",
                         [
@@ -827,7 +837,7 @@ def on_demand_apdex_snql_factory(aggregate_filter, org_id, use_case_id, alias=No
             2,
         ],
     )
-    total = Function("countIf", [Column("value"), aggregate_filter])
+    total = Function("countIf", [VALUE_COLUMN, aggregate_filter])
 
     return Function(
         "divide",
@@ -32,7 +32,7 @@ from typing import Optional
 from sentry.snuba.metrics.utils import OP_REGEX
 
 NAMESPACE_REGEX = r"(transactions|errors|issues|sessions|alerts|custom|spans)"
-ENTITY_TYPE_REGEX = r"(c|s|d|g|e)"
+ENTITY_TYPE_REGEX = r"([csdge])"
 # This regex allows for a string of words composed of small letters alphabet characters with
 # allowed the underscore character, optionally separated by a single dot
 MRI_NAME_REGEX = r"([a-z_]+(?:\.[a-z_]+)*)"
@@ -12,6 +12,7 @@ __all__ = (
 
 from datetime import datetime, timedelta
 from enum import Enum
+from itertools import chain
 from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 import sentry_sdk
@@ -40,6 +41,7 @@ from sentry.search.events.types import WhereType
 from sentry.sentry_metrics.use_case_id_registry import UseCaseID
 from sentry.sentry_metrics.utils import (
     STRING_NOT_FOUND,
+    bulk_reverse_resolve_tag_value,
     resolve_tag_key,
     resolve_tag_value,
     resolve_weak,
@@ -81,9 +83,10 @@ from sentry.snuba.metrics.utils import (
     MetricDoesNotExistException,
     get_num_intervals,
     require_rhs_condition_resolution,
+    to_intervals,
 )
 from sentry.snuba.sessions_v2 import finite_or_none
-from sentry.utils.dates import parse_stats_period, to_datetime
+from sentry.utils.dates import parse_stats_period
 from sentry.utils.snuba import parse_snuba_datetime
 
 QUERY_PROJECT_LIMIT = 10
@@ -150,7 +153,14 @@ def transform_null_transaction_to_unparameterized(use_case_id, org_id, alias=Non
 # These are only allowed because the parser in metrics_sessions_v2
 # generates them. Long term we should not allow any functions, but rather
 # a limited expression language with only AND, OR, IN and NOT IN
-FUNCTION_ALLOWLIST = ("and", "or", "equals", "in", "tuple", "has", "match", "team_key_transaction")
+FUNCTION_ALLOWLIST = frozenset(
+    ("and", "or", "equals", "in", "tuple", "has", "match", "team_key_transaction")
+)
+
+# Columns whose name does not need to be resolved through the indexer.
+UNRESOLVED_COLUMNS = frozenset(["project_id", "tags.key"])
+# Tag keys that are allowed inside of a `match` function.
+MATCH_ALLOWED_TAG_KEYS = {tag: "match" for tag in FILTERABLE_TAGS}
 
 
 def resolve_tags(
@@ -168,8 +178,12 @@ def resolve_tags(
     if input_ is None:
         return None
     if isinstance(input_, (list, tuple)):
+        # The elements are almost always tag values, which are resolved directly instead of going
+        # through another `resolve_tags` call per element
         elements = [
-            resolve_tags(
+            resolve_tag_value(use_case_id, org_id, item)
+            if isinstance(item, str)
+            else resolve_tags(
                 use_case_id,
                 org_id,
                 item,
@@ -217,13 +231,10 @@ def resolve_tags(
                 ],
             )
         elif input_.function == "match":
-            restricted_tag_keys = {tag: "match" for tag in FILTERABLE_TAGS}
-
             if allowed_tag_keys is None:
-                new_allowed_tag_keys = restricted_tag_keys
+                new_allowed_tag_keys = MATCH_ALLOWED_TAG_KEYS
             else:
-                new_allowed_tag_keys = allowed_tag_keys.copy()
-                new_allowed_tag_keys.update(restricted_tag_keys)
+                new_allowed_tag_keys = {**allowed_tag_keys, **MATCH_ALLOWED_TAG_KEYS}
 
             return Function(
                 function=input_.function,
@@ -334,7 +345,7 @@ def resolve_tags(
         )
     if isinstance(input_, Column):
         # If a column has the name belonging to the set, it means that we don't need to resolve its name.
-        if input_.name in frozenset(["project_id", "tags.key"]):
+        if input_.name in UNRESOLVED_COLUMNS:
             return input_
 
         # HACK: Some tags already take the form "tags[...]" in discover, take that into account:
@@ -408,6 +419,10 @@ def is_tag_key_allowed(tag_key: str, allowed_tag_keys: Optional[Dict[str, str]])
 
 def parse_query(query_string: str, projects: Sequence[Project]) -> Sequence[Condition]:
     """Parse given filter query into a list of snuba conditions"""
+    # A blank query has no conditions, so there is no need to set up a query builder for it
+    if not query_string.strip():
+        return []
+
     # HACK: Parse a sessions query, validate / transform afterwards.
     # We will want to write our own grammar + interpreter for this later.
     try:
@@ -556,12 +571,8 @@ def get_date_range(params: Mapping) -> Tuple[datetime, datetime, int]:
     interval = int(3600 if interval is None else interval.total_seconds())
 
     start, end = get_date_range_from_params(params, default_stats_period=timedelta(days=1))
-    date_range = timedelta(
-        seconds=int(interval * get_num_intervals(end=end, start=start, granularity=interval))
-    )
-
-    end = to_datetime(int(interval * get_num_intervals(start=None, end=end, granularity=interval)))
-    start = end - date_range
+    # Aligns start downwards and end upwards to the interval in a single pass over the timestamps.
+    start, end, _num_intervals = to_intervals(start, end, interval)
     # NOTE: The sessions_v2 implementation cuts the `end` time to now + 1 minute
     # if `end` is in the future. This allows for better real time results when
     # caching is enabled on the snuba queries. Removed here for simplicity,
@@ -618,7 +629,7 @@ def get_alias_meta_type(
         if isinstance(field, str):
             if field in DATASET_COLUMNS:
                 return AliasMetaType.DATASET_COLUMN, parsed_expr
-            elif field in [TS_COL_GROUP]:
+            elif field == TS_COL_GROUP:
                 return AliasMetaType.TIME_COLUMN, parsed_expr
             else:
                 return AliasMetaType.TAG, parsed_expr
@@ -629,7 +640,7 @@ def get_alias_meta_type(
     # of the original function.
     if parsed_alias in DATASET_COLUMNS:
         return AliasMetaType.DATASET_COLUMN, parsed_expr
-    elif parsed_alias in [TS_COL_GROUP]:
+    elif parsed_alias == TS_COL_GROUP:
         return AliasMetaType.TIME_COLUMN, parsed_expr
 
     return AliasMetaType.SELECT_METRIC_FIELD, parsed_expr
@@ -728,6 +739,14 @@ class SnubaQueryBuilder:
         "generic_metrics_sets",
     }
 
+    __slots__ = (
+        "_projects",
+        "_metrics_query",
+        "_org_id",
+        "_use_case_id",
+        "_alias_to_metric_field",
+    )
+
     def __init__(
         self,
         projects: Sequence[Project],
@@ -884,9 +903,12 @@ class SnubaQueryBuilder:
         if metric_condition_filters:
             where.extend(metric_condition_filters)
 
-        filter_ = resolve_tags(self._use_case_id, self._org_id, snuba_conditions, self._projects)
-        if filter_:
-            where.extend(filter_)
+        if snuba_conditions:
+            filter_ = resolve_tags(
+                self._use_case_id, self._org_id, snuba_conditions, self._projects
+            )
+            if filter_:
+                where.extend(filter_)
 
         return where
 
@@ -1069,6 +1091,15 @@ class SnubaQueryBuilder:
 
         where = self._build_where()
         groupby = self._build_groupby()
+        intervals_len = get_num_intervals(
+            self._metrics_query.start,
+            self._metrics_query.end,
+            self._metrics_query.granularity.granularity,
+            interval=self._metrics_query.interval,
+        )
+        # The order by does not depend on the entity, so it is built once instead of for every
+        # entity query (building it validates and generates the SnQL of every order by field)
+        orderby = self._build_orderby() if fields_in_entities else None
 
         queries_dict = {}
         for entity, fields in fields_in_entities.items():
@@ -1097,7 +1128,6 @@ class SnubaQueryBuilder:
                     list(metric_ids_set),
                 ),
             ]
-            orderby = self._build_orderby()
 
             # Functionally [] and None will be the same and the same applies for Offset(0) and None.
             queries_dict[entity] = self.__build_totals_and_series_queries(
@@ -1110,12 +1140,7 @@ class SnubaQueryBuilder:
                 limit=self._metrics_query.limit,
                 offset=self._metrics_query.offset,  # No offset is set to None.
                 rollup=self._metrics_query.granularity,
-                intervals_len=get_num_intervals(
-                    self._metrics_query.start,
-                    self._metrics_query.end,
-                    self._metrics_query.granularity.granularity,
-                    interval=self._metrics_query.interval,
-                ),
+                intervals_len=intervals_len,
             )
 
         return queries_dict, fields_in_entities
@@ -1124,6 +1149,25 @@ class SnubaQueryBuilder:
 class SnubaResultConverter:
     """Interpret a Snuba result and convert it to API format"""
 
+    # Attributes of the converter are read for every row returned by snuba
+    __slots__ = (
+        "_organization_id",
+        "_intervals",
+        "_results",
+        "_metrics_query",
+        "_use_case_id",
+        "_alias_to_metric_field",
+        "_metrics_query_fields_set",
+        "_fields_in_entities_set",
+        "_set_of_constituent_queries",
+        "_constituent_default_null_values",
+        "_bottom_up_dependency_tree",
+        "_post_query_operations",
+        "_timestamp_index",
+        "_bucketed_time_indexes",
+        "_group_key_aliases",
+    )
+
     def __init__(
         self,
         organization_id: int,
@@ -1158,6 +1202,12 @@ class SnubaResultConverter:
         self._set_of_constituent_queries = self._fields_in_entities_set.union(
             self._metrics_query_fields_set
         )
+        # The default null value of each queried field does not depend on the row, so the metric
+        # objects are only built once here instead of for every field of every row
+        self._constituent_default_null_values = [
+            (alias, metric_object_factory(op, metric_mri).generate_default_null_values())
+            for op, metric_mri, alias in self._set_of_constituent_queries
+        ]
 
         # This basically generate a dependency tree for all instances of `MetricFieldBase` so
         # that in the case of a CompositeEntityDerivedMetric, we are able to calculate it but
@@ -1165,16 +1215,48 @@ class SnubaResultConverter:
         self._bottom_up_dependency_tree = generate_bottom_up_dependency_tree_for_metrics(
             self._metrics_query_fields_set
         )
+        # The metric objects and params needed to run the post query operations are the same for
+        # every group, so they are resolved once here instead of once per group and interval
+        self._post_query_operations = [
+            (
+                metric_object_factory(op=op, metric_mri=metric_mri),
+                alias,
+                self._alias_to_metric_field[alias].params
+                if alias in self._alias_to_metric_field
+                else None,
+            )
+            for op, metric_mri, alias in self._bottom_up_dependency_tree
+        ]
 
         self._timestamp_index = {timestamp: index for index, timestamp in enumerate(intervals)}
-
-    def _extract_data(self, data, groups):
-        group_key_aliases = (
-            {metric_groupby_obj.alias for metric_groupby_obj in self._metrics_query.groupby}
+        # Every group returns the same time buckets, so each distinct snuba timestamp is parsed and
+        # mapped to its series index once. Snuba buckets are not guaranteed to line up with the
+        # intervals, so the index still comes from `_timestamp_index` rather than arithmetic
+        self._bucketed_time_indexes: Dict[str, Optional[int]] = {}
+
+        # The group by aliases are the same for every row, so they are sorted once here instead
+        # of sorting the keys of every row returned by snuba
+        self._group_key_aliases = (
+            tuple(
+                sorted(
+                    {metric_groupby_obj.alias for metric_groupby_obj in self._metrics_query.groupby}
+                )
+            )
             if self._metrics_query.groupby
-            else set()
+            else ()
         )
-        tags = tuple((key, data[key]) for key in sorted(data.keys()) if key in group_key_aliases)
+
+    def _get_series_index(self, bucketed_time: str) -> Optional[int]:
+        try:
+            return self._bucketed_time_indexes[bucketed_time]
+        except KeyError:
+            series_index = self._bucketed_time_indexes[bucketed_time] = self._timestamp_index.get(
+                parse_snuba_datetime(bucketed_time)
+            )
+            return series_index
+
+    def _extract_data(self, data, groups):
+        tags = tuple((key, data[key]) for key in self._group_key_aliases if key in data)
 
         tag_data = groups.setdefault(tags, {})
         if self._metrics_query.include_series:
@@ -1183,17 +1265,12 @@ class SnubaResultConverter:
             tag_data.setdefault("totals", {})
 
         bucketed_time = data.pop(TS_COL_GROUP, None)
-        if bucketed_time is not None:
-            bucketed_time = parse_snuba_datetime(bucketed_time)
+        series_index = self._get_series_index(bucketed_time) if bucketed_time is not None else None
 
         # We query the union of the metrics_query fields, and the fields_in_entities from the
         # QueryBuilder necessary as it contains the constituent instances of
         # SingularEntityDerivedMetric for instances of CompositeEntityDerivedMetric
-        for op, metric_mri, alias in self._set_of_constituent_queries:
-            default_null_value = metric_object_factory(
-                op, metric_mri
-            ).generate_default_null_values()
-
+        for alias, default_null_value in self._constituent_default_null_values:
             try:
                 value = data[alias]
             except KeyError:
@@ -1220,21 +1297,29 @@ class SnubaResultConverter:
 
             if self._metrics_query.include_series:
                 if bucketed_time is not None or tag_data["totals"][alias] == default_null_value:
-                    empty_values = len(self._intervals) * [default_null_value]
-                    series = tag_data["series"].setdefault(alias, empty_values)
-
-                    if bucketed_time is not None and bucketed_time in self._timestamp_index:
-                        series_index = self._timestamp_index[bucketed_time]
+                    # The empty series is only built the first time the alias is seen for this
+                    # group, `setdefault` would build (and throw away) one for every row
+                    series = tag_data["series"].get(alias)
+                    if series is None:
+                        series = tag_data["series"][alias] = len(self._intervals) * [
+                            default_null_value
+                        ]
+
+                    if series_index is not None:
                         if series[series_index] == default_null_value:
                             series[series_index] = cleaned_value
 
     def translate_result_groups(self):
         groups = {}
-        for _, subresults in self._results.items():
-            for k in "totals", "series":
-                if k in subresults:
-                    for data in subresults[k]["data"]:
-                        self._extract_data(data, groups)
+        # The totals and series rows of every entity are extracted in a single pass, the per field
+        # lookups `_extract_data` needs are prepared once in `__init__`
+        for data in chain.from_iterable(
+            subresults[k]["data"]
+            for subresults in self._results.values()
+            for k in ("totals", "series")
+            if k in subresults
+        ):
+            self._extract_data(data, groups)
 
         # Creating this dictionary serves the purpose of having a mapping from the alias of a groupBy column to the
         # original groupBy column, and we need this to determine for which tag values we don't need to reverse resolve
@@ -1253,63 +1338,61 @@ class SnubaResultConverter:
             else {}
         )
 
-        groups = [
-            dict(
-                by=dict(
-                    (
-                        key,
-                        reverse_resolve_tag_value(
-                            self._use_case_id, self._organization_id, value, weak=True
-                        ),
-                    )
-                    if groupby_alias_to_groupby_column.get(key) not in NON_RESOLVABLE_TAG_VALUES
-                    else (key, value)
-                    for key, value in tags
-                ),
-                **data,
+        # Reverse resolve all the tag values of all the groups in a single indexer round trip.
+        # Values left out of the bulk lookup (e.g. 0 or unknown indexes) fall back to
+        # `reverse_resolve_tag_value` below, which keeps its `None` and error semantics. Queries
+        # without tag values to resolve skip the indexer altogether
+        tag_values = {
+            value
+            for tags in groups
+            for key, value in tags
+            if groupby_alias_to_groupby_column.get(key) not in NON_RESOLVABLE_TAG_VALUES
+        }
+        resolved_tag_values: Dict[Union[int, str, None], Optional[str]] = {}
+        if tag_values:
+            resolved_tag_values.update(
+                bulk_reverse_resolve_tag_value(self._use_case_id, self._organization_id, tag_values)
             )
-            for tags, data in groups.items()
-        ]
 
-        # Applying post query operations for totals and series
-        for group in groups:
+        translated_groups = []
+        for tags, data in groups.items():
+            by = {}
+            for key, value in tags:
+                if groupby_alias_to_groupby_column.get(key) in NON_RESOLVABLE_TAG_VALUES:
+                    by[key] = value
+                    continue
+                try:
+                    by[key] = resolved_tag_values[value]
+                except KeyError:
+                    by[key] = resolved_tag_values[value] = reverse_resolve_tag_value(
+                        self._use_case_id, self._organization_id, value, weak=True
+                    )
+            group = dict(by=by, **data)
             totals = group.get("totals")
             series = group.get("series")
 
-            for op, metric_mri, alias in self._bottom_up_dependency_tree:
-                metric_obj = metric_object_factory(op=op, metric_mri=metric_mri)
+            # Applying post query operations for totals and series
+            for metric_obj, alias, params in self._post_query_operations:
                 if totals is not None:
-                    try:
-                        params = self._alias_to_metric_field[alias].params
-                    except KeyError:
-                        params = None
                     totals[alias] = metric_obj.run_post_query_function(
                         totals, params=params, alias=alias
                     )
 
                 if series is not None:
                     # Series
+                    series.setdefault(
+                        alias,
+                        [metric_obj.generate_default_null_values()] * len(self._intervals),
+                    )
                     for idx in range(0, len(self._intervals)):
-                        series.setdefault(
-                            alias,
-                            [metric_obj.generate_default_null_values()] * len(self._intervals),
-                        )
-                        try:
-                            params = self._alias_to_metric_field[alias].params
-                        except KeyError:
-                            params = None
                         series[alias][idx] = metric_obj.run_post_query_function(
                             series, params=params, idx=idx, alias=alias
                         )
 
-        # Remove the extra fields added due to the constituent metrics that were added
-        # from the generated dependency tree. These metrics that are to be removed were added to
-        # be able to generate fields that require further processing post query, but are not
-        # required nor expected in the response
-        for group in groups:
-            totals = group.get("totals")
-            series = group.get("series")
-
+            # Remove the extra fields added due to the constituent metrics that were added
+            # from the generated dependency tree. These metrics that are to be removed were added to
+            # be able to generate fields that require further processing post query, but are not
+            # required nor expected in the response
             for key in set(totals or ()) | set(series or ()):
                 metric_field = self._alias_to_metric_field.get(key)
 
@@ -1318,4 +1401,7 @@ class SnubaResultConverter:
                         del totals[key]
                     if series is not None:
                         del series[key]
-        return groups
+
+            translated_groups.append(group)
+
+        return translated_groups
@@ -52,7 +52,6 @@ __all__ = (
     "OrderByNotSupportedOverCompositeEntityException",
     "MetricEntity",
     "UNALLOWED_TAGS",
-    "combine_dictionary_of_list_values",
     "get_intervals",
     "get_num_intervals",
     "to_intervals",
@@ -196,9 +195,9 @@ def generate_operation_regex():
     """
     Generates a regex of all supported operations defined in OP_TO_SNUBA_FUNCTION
     """
-    operations = []
-    for item in OP_TO_SNUBA_FUNCTION.values():
-        operations += list(item.keys())
+    # Operations like `sum` or `min_timestamp` are supported by several entities, but they only
+    # need to be a single branch of the alternation
+    operations = dict.fromkeys(op for item in OP_TO_SNUBA_FUNCTION.values() for op in item)
     return rf"({'|'.join(map(str, operations))})"
 
 
@@ -328,23 +327,6 @@ DATASET_COLUMNS = {"project_id", "metric_id"}
 CUSTOM_MEASUREMENT_DATASETS = {"generic_distribution"}
 
 
-def combine_dictionary_of_list_values(main_dict, other_dict):
-    """
-    Function that combines dictionary of lists. For instance, let's say we have
-    Dict A -> {"a": [1,2], "b": [3]} and Dict B -> {"a": [6], "c": [4]}
-    Calling this function would result in {"a": [1, 2, 6], "b": [3], "c": [4]}
-    """
-    if not isinstance(main_dict, dict) or not isinstance(other_dict, dict):
-        raise TypeError()
-    for key, value in other_dict.items():
-        main_dict.setdefault(key, [])
-        if not isinstance(value, list) or not isinstance(main_dict[key], list):
-            raise TypeError()
-        main_dict[key] += value
-        main_dict[key] = list(set(main_dict[key]))
-    return main_dict
-
-
 class MetricDoesNotExistException(Exception):
     ...
 
@@ -30,19 +30,18 @@ class MetricsWrapper(Metrics):
         tags: Optional[Tags] = None,
     ) -> None:
         self.__backend = backend
-        self.__name = name
+        self.__name_prefix = f"{name}." if name is not None else ""
         self.__tags = tags
 
     def __merge_name(self, name: str) -> str:
-        if self.__name is None:
-            return name
-        else:
-            return f"{self.__name}.{name}"
+        return self.__name_prefix + name
 
     def __merge_tags(self, tags: Optional[Tags]) -> Optional[Tags]:
         if self.__tags is None:
             return tags
-        elif tags is None:
+        elif not tags:
+            # An empty mapping adds nothing, hand back the base tags as-is
+            # instead of copying them. Backends must not mutate `tags`.
             return self.__tags
         else:
             return {**self.__tags, **tags}
@@ -1,8 +1,22 @@
+import re
 from typing import Any, Mapping, Sequence
 
-from sentry.utils.glob import glob_match
 from sentry.utils.sdk_crashes.sdk_crash_detector import SDKCrashDetector, SDKCrashDetectorConfig
 
+# A single regular expression equivalent to any of the case insensitive globs `*sentrycrash*`,
+# `*\[Sentry*`, `*(Sentry*)*` and `SentryMX*`, compiled once instead of on every frame
+SDK_FUNCTION_PATTERN = re.compile(
+    r"sentrycrash"
+    r"|\[Sentry"
+    # Objective-C class extension categories
+    r"|\(Sentry.*\)"
+    # MetricKit Swift classes
+    r"|\ASentryMX",
+    re.IGNORECASE | re.DOTALL,
+)
+# Equivalent to the case insensitive glob `Sentry**`
+SDK_FILENAME_PATTERN = re.compile(r"\ASentry", re.IGNORECASE)
+
 
 class CocoaSDKCrashDetector(SDKCrashDetector):
     def __init__(self):
@@ -47,23 +61,12 @@ class CocoaSDKCrashDetector(SDKCrashDetector):
     def is_sdk_frame(self, frame: Mapping[str, Any]) -> bool:
 
         function = frame.get("function")
-        if function:
-            function_matchers = [
-                r"*sentrycrash*",
-                r"*\[Sentry*",
-                r"*(Sentry*)*",  # Objective-C class extension categories
-                r"SentryMX*",  # MetricKit Swift classes
-            ]
-            for matcher in function_matchers:
-                if glob_match(function, matcher, ignorecase=True):
-                    return True
+        if function and SDK_FUNCTION_PATTERN.search(function):
+            return True
 
         filename = frame.get("filename")
-        if filename:
-            filenameMatchers = ["Sentry**"]
-            for matcher in filenameMatchers:
-                if glob_match(filename, matcher, ignorecase=True):
-                    return True
+        if filename and SDK_FILENAME_PATTERN.search(filename):
+            return True
 
         return False
 
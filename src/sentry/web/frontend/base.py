@@ -481,11 +481,7 @@ class BaseView(View, OrganizationMixin):
         return render_to_response(template, default_context, self.request, status=status)
 
     def redirect(self, url: str, headers: Mapping[str, str] | None = None) -> HttpResponse:
-        res = HttpResponseRedirect(url)
-        if headers:
-            for k, v in headers.items():
-                res[k] = v
-        return res
+        return HttpResponseRedirect(url, headers=headers)
 
     def get_team_list(self, user: User, organization: Organization) -> list[Team]:
         return Team.objects.get_for_user(organization=organization, user=user, with_projects=True)
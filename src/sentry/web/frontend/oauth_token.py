@@ -68,27 +68,47 @@ class OAuthTokenView(View):
         if grant_type not in [GrantTypes.AUTHORIZATION, GrantTypes.REFRESH]:
             return self.error(request=request, name="unsupported_grant_type")
 
-        try:
-            application = ApiApplication.objects.get(
-                client_id=client_id, client_secret=client_secret, status=ApiApplicationStatus.active
-            )
-        except ApiApplication.DoesNotExist:
-            metrics.incr(
-                "oauth_token.post.invalid",
-                sample_rate=1.0,
-            )
-            logger.warning("Invalid client_id / secret pair", extra={"client_id": client_id})
-            return self.error(
-                request=request,
-                name="invalid_credentials",
-                reason="invalid client_id or client_secret",
-                status=401,
-            )
+        # The grant or refresh token is fetched together with its application, so issuing a token
+        # takes a single round trip. The application is only looked up on its own when that
+        # lookup comes back empty, to tell invalid credentials apart from an invalid grant
+        application: Optional[ApiApplication] = None
+        grant: Optional[ApiGrant] = None
+        refresh_token: Optional[ApiToken] = None
+        if grant_type == GrantTypes.AUTHORIZATION:
+            grant = self._get_grant(request, client_id, client_secret)
+            if grant is not None:
+                application = grant.application
+        else:
+            refresh_token = self._get_refresh_token(request, client_id, client_secret)
+            if refresh_token is not None:
+                application = refresh_token.application
+
+        if application is None:
+            try:
+                application = ApiApplication.objects.get(
+                    client_id=client_id,
+                    client_secret=client_secret,
+                    status=ApiApplicationStatus.active,
+                )
+            except ApiApplication.DoesNotExist:
+                metrics.incr(
+                    "oauth_token.post.invalid",
+                    sample_rate=1.0,
+                )
+                logger.warning("Invalid client_id / secret pair", extra={"client_id": client_id})
+                return self.error(
+                    request=request,
+                    name="invalid_credentials",
+                    reason="invalid client_id or client_secret",
+                    status=401,
+                )
 
         if grant_type == GrantTypes.AUTHORIZATION:
-            token_data = self.get_access_tokens(request=request, application=application)
+            token_data = self.get_access_tokens(
+                request=request, application=application, grant=grant
+            )
         else:
-            token_data = self.get_refresh_token(request=request, application=application)
+            token_data = self.get_refresh_token(request=request, refresh_token=refresh_token)
         if "error" in token_data:
             return self.error(
                 request=request,
@@ -100,11 +120,44 @@ class OAuthTokenView(View):
             id_token=token_data["id_token"] if "id_token" in token_data else None,
         )
 
-    def get_access_tokens(self, request: Request, application: ApiApplication) -> dict:
+    def _get_grant(
+        self, request: HttpRequest, client_id: str, client_secret: str
+    ) -> Optional[ApiGrant]:
         code = request.POST.get("code")
+        if not code:
+            return None
+
         try:
-            grant = ApiGrant.objects.get(application=application, code=code)
+            return ApiGrant.objects.select_related("application", "user").get(
+                application__client_id=client_id,
+                application__client_secret=client_secret,
+                application__status=ApiApplicationStatus.active,
+                code=code,
+            )
         except ApiGrant.DoesNotExist:
+            return None
+
+    def _get_refresh_token(
+        self, request: HttpRequest, client_id: str, client_secret: str
+    ) -> Optional[ApiToken]:
+        refresh_token_code = request.POST.get("refresh_token")
+        if not refresh_token_code:
+            return None
+
+        try:
+            return ApiToken.objects.select_related("application", "user").get(
+                application__client_id=client_id,
+                application__client_secret=client_secret,
+                application__status=ApiApplicationStatus.active,
+                refresh_token=refresh_token_code,
+            )
+        except ApiToken.DoesNotExist:
+            return None
+
+    def get_access_tokens(
+        self, request: Request, application: ApiApplication, grant: Optional[ApiGrant]
+    ) -> dict:
+        if grant is None:
             return {"error": "invalid_grant", "reason": "invalid grant"}
 
         if grant.is_expired():
@@ -127,7 +180,7 @@ class OAuthTokenView(View):
             token_data["id_token"] = open_id_token.get_signed_id_token(grant=grant)
         return token_data
 
-    def get_refresh_token(self, request: Request, application: ApiApplication) -> dict:
+    def get_refresh_token(self, request: Request, refresh_token: Optional[ApiToken]) -> dict:
         refresh_token_code = request.POST.get("refresh_token")
         scope = request.POST.get("scope")
 
@@ -138,11 +191,7 @@ class OAuthTokenView(View):
         if scope:
             return {"error": "invalid_request"}
 
-        try:
-            refresh_token = ApiToken.objects.get(
-                application=application, refresh_token=refresh_token_code
-            )
-        except ApiToken.DoesNotExist:
+        if refresh_token is None:
             return {"error": "invalid_grant", "reason": "invalid request"}
         refresh_token.refresh()
 
@@ -1,11 +1,13 @@
 import copy
+from datetime import datetime
 from functools import partial
 from unittest import mock
 from unittest.mock import patch
 
 import pytest
-from snuba_sdk import Column, Direction, Function, OrderBy
+from snuba_sdk import Column, Condition, Direction, Function, Op, OrderBy
 
+from sentry.api.utils import InvalidParams
 from sentry.sentry_metrics import indexer
 from sentry.sentry_metrics.use_case_id_registry import UseCaseID
 from sentry.sentry_metrics.utils import resolve_tag_value, resolve_weak
@@ -16,6 +18,7 @@ from sentry.snuba.metrics import (
     NotSupportedOverCompositeEntityException,
     SingularEntityDerivedMetric,
 )
+from sentry.snuba.metrics.fields import bulk_run_metrics_query, run_metrics_query
 from sentry.snuba.metrics.fields.base import (
     COMPOSITE_ENTITY_CONSTITUENT_ALIAS,
     DERIVED_ALIASES,
@@ -38,6 +41,7 @@ from sentry.snuba.metrics.fields.snql import (
     uniq_aggregation_on_metric,
 )
 from sentry.snuba.metrics.naming_layer import SessionMRI, TransactionMRI, get_public_name_from_mri
+from sentry.snuba.metrics.utils import MetricDoesNotExistException
 from sentry.testutils.cases import TestCase
 
 pytestmark = pytest.mark.sentry_metrics
@@ -136,6 +140,36 @@ class SingleEntityDerivedMetricTestCase(TestCase):
         with pytest.raises(DerivedMetricParseException):
             self.crash_free_fake.get_entity(projects=[self.project], use_case_id=use_case_id)
 
+    @mock.patch(
+        "sentry.snuba.metrics.fields.base.get_public_name_from_mri",
+        mocked_mri_resolver(["crash_free_fake"], get_public_name_from_mri),
+    )
+    def test_get_entity_with_unknown_constituent_spanning_multiple_entities(self):
+        def get_entity_of_metric_or_raise(projects, metric_mri, use_case_id):
+            if metric_mri == SessionMRI.ERROR.value:
+                raise InvalidParams()
+            return get_entity_of_metric_mocked(projects, metric_mri, use_case_id)
+
+        # The raw constituents span the counters and sets entities, and one of them does not exist
+        crash_free_fake = SingularEntityDerivedMetric(
+            metric_mri="crash_free_fake",
+            metrics=[
+                SessionMRI.CRASHED.value,
+                SessionMRI.ALL_USER.value,
+                SessionMRI.ERRORED_SET.value,
+            ],
+            unit="percentage",
+            snql=lambda *args, **kwargs: None,
+        )
+        # Every constituent is looked up before deciding, so the one that does not exist wins
+        # over the others spanning multiple entities, whatever order they are visited in
+        with mock.patch(
+            "sentry.snuba.metrics.fields.base._get_entity_of_metric_mri",
+            get_entity_of_metric_or_raise,
+        ):
+            with pytest.raises(MetricDoesNotExistException):
+                crash_free_fake.get_entity(projects=[self.project], use_case_id=UseCaseID.SESSIONS)
+
     @mock.patch(
         "sentry.snuba.metrics.fields.base._get_entity_of_metric_mri", get_entity_of_metric_mocked
     )
@@ -504,6 +538,10 @@ class CompositeEntityDerivedMetricTestCase(TestCase):
             ),
             (None, SessionMRI.ERRORED.value, alias),
         ]
+        # The traversal is cached, but the aliases still follow the one passed in
+        assert list(
+            self.sessions_errored.generate_bottom_up_derived_metrics_dependencies("other")
+        )[-1] == (None, SessionMRI.ERRORED.value, "other")
 
         alias = "random_composite"
         assert list(
@@ -644,3 +682,44 @@ class DerivedMetricAliasTestCase(TestCase):
 )
 def test_known_entity_of_metric_mri(metric_mri, expected_entity):
     assert _get_known_entity_of_metric_mri(metric_mri) == expected_entity
+
+
+def test_bulk_run_metrics_query_matches_run_metrics_query():
+    query_kwargs = dict(
+        select=[Column("tags.key")],
+        where=[Condition(Column("metric_id"), Op.IN, [1, 2])],
+        groupby=[Column("metric_id")],
+        project_ids=[1],
+        org_id=1,
+        referrer="snuba.metrics.test",
+        start=datetime(2023, 1, 1),
+        end=datetime(2023, 1, 2),
+    )
+    entity_keys = [EntityKey.MetricsSets, EntityKey.MetricsCounters]
+
+    def apply_cache_and_build_results(snuba_param_list, referrer=None, use_cache=False):
+        return [
+            {"data": [{"entity": request.query.match.name}]}
+            for request, _, _ in snuba_param_list
+        ]
+
+    with mock.patch(
+        "sentry.utils.snuba._apply_cache_and_build_results",
+        side_effect=apply_cache_and_build_results,
+    ) as apply_mock:
+        bulk_rows = bulk_run_metrics_query(entity_keys=entity_keys, **query_kwargs)
+        rows = [
+            run_metrics_query(entity_key=entity_key, **query_kwargs) for entity_key in entity_keys
+        ]
+
+    # The data of each entity comes back in the order of `entity_keys`, as with one query each
+    assert bulk_rows == rows == [[{"entity": "metrics_sets"}], [{"entity": "metrics_counters"}]]
+
+    bulk_call, *single_calls = apply_mock.call_args_list
+    assert len(single_calls) == len(entity_keys)
+    bulk_requests = [request for request, _, _ in bulk_call.args[0]]
+    assert bulk_requests == [call.args[0][0][0] for call in single_calls]
+    for call in apply_mock.call_args_list:
+        assert call.kwargs == {"referrer": "snuba.metrics.test", "use_cache": True}
+    for request in bulk_requests:
+        assert request.tenant_ids == {"organization_id": 1, "referrer": "snuba.metrics.test"}
@@ -264,6 +264,11 @@ def test_parse_query(query_string, expected):
     assert parsed == expected()
 
 
+@pytest.mark.parametrize("query_string", ["", "   ", "\t\n"])
+def test_parse_query_blank(query_string):
+    assert parse_query(query_string, []) == []
+
+
 @freeze_time("2018-12-11 03:21:00")
 def test_round_range():
     # since data is not exactly aligned it will return 2d + 1h (+ one interval to cover everything)
@@ -1119,14 +1124,21 @@ def test_translate_results_missing_slots(_1, _2):
     intervals = list(
         get_intervals(query_definition.start, query_definition.end, query_definition.rollup)
     )
-    assert SnubaResultConverter(
-        org_id,
-        query_definition.to_metrics_query(),
-        fields_in_entities,
-        intervals,
-        results,
-        use_case_id,
-    ).translate_result_groups() == [
+    with mock.patch(
+        "sentry.snuba.metrics.query_builder.bulk_reverse_resolve_tag_value"
+    ) as bulk_reverse_resolve_tag_value:
+        translated_groups = SnubaResultConverter(
+            org_id,
+            query_definition.to_metrics_query(),
+            fields_in_entities,
+            intervals,
+            results,
+            use_case_id,
+        ).translate_result_groups()
+
+    # There are no tag values to reverse resolve without a group by
+    bulk_reverse_resolve_tag_value.assert_not_called()
+    assert translated_groups == [
         {
             "by": {},
             "totals": {
@@ -2,7 +2,13 @@ from datetime import datetime, timedelta, timezone
 
 import pytest
 
-from sentry.snuba.metrics.utils import get_intervals, get_num_intervals, to_intervals
+from sentry.snuba.metrics.utils import (
+    OP_REGEX,
+    OP_TO_SNUBA_FUNCTION,
+    get_intervals,
+    get_num_intervals,
+    to_intervals,
+)
 
 MINUTE = 60
 HOUR = 60 * MINUTE
@@ -377,3 +383,9 @@ def test_get_intervals_checks_valid_interval():
 
     with pytest.raises(AssertionError):
         list(get_intervals(start=start, end=end, granularity=-3600))
+
+
+def test_op_regex_has_each_operation_once():
+    operations = OP_REGEX[1:-1].split("|")
+    assert len(operations) == len(set(operations))
+    assert set(operations) == {op for ops in OP_TO_SNUBA_FUNCTION.values() for op in ops}
@@ -0,0 +1,45 @@
+import pytest
+
+from sentry.utils.sdk_crashes.cocoa_sdk_crash_detector import CocoaSDKCrashDetector
+
+
+@pytest.mark.parametrize(
+    "function,expected",
+    [
+        ("-[SentryHub getScope]", True),
+        ("sentrycrashdl_getBinaryImage", True),
+        ("-[sentryisgreat]", True),
+        ("__47-[SentryBreadcrumbTracker swizzleViewDidAppear]_block_invoke_2", True),
+        ("+[NSDate(SentryExtras) sentry_fromIso8601String:]", True),
+        ("-[NSData(Sentry) sentry_nullTerminated:]", True),
+        ("-[NSData(Sentry\nExtras) sentry_nullTerminated:]", True),
+        ("SentryMXManager.didReceive", True),
+        ("sentrymxmanager.didReceive", True),
+        ("-[SentryCrash crash]", True),
+        ("SentryManager.didReceive", False),
+        ("Foo.SentryMXManager.didReceive", False),
+        ("-[NSData(Sentry sentry_nullTerminated:]", False),
+        ("-[SenryHub getScope]", False),
+        ("-SentryHub getScope]", False),
+        ("-[SomeSentryHub getScope]", False),
+        ("", False),
+        (None, False),
+    ],
+)
+def test_is_sdk_frame_function(function, expected):
+    assert CocoaSDKCrashDetector().is_sdk_frame({"function": function}) is expected
+
+
+@pytest.mark.parametrize(
+    "filename,expected",
+    [
+        ("SentryCrashMonitor_CPPException.cpp", True),
+        ("SentryMonitor_CPPException.cpp", True),
+        ("sentrymonitor_cppexception.cpp", True),
+        ("SentrMonitor_CPPException.cpp", False),
+        ("NotSentryMonitor.cpp", False),
+        (None, False),
+    ],
+)
+def test_is_sdk_frame_filename(filename, expected):
+    assert CocoaSDKCrashDetector().is_sdk_frame({"filename": filename}) is expected
@@ -0,0 +1,31 @@
+from unittest.mock import Mock
+
+from sentry.utils.arroyo import MetricsWrapper
+
+
+def test_metrics_wrapper_merges_tags():
+    backend = Mock()
+    base_tags = {"a": "1"}
+    metrics = MetricsWrapper(backend, "consumer", tags=base_tags)
+
+    metrics.increment("processed")
+    backend.incr.assert_called_once_with(key="consumer.processed", amount=1, tags={"a": "1"})
+    assert backend.incr.call_args.kwargs["tags"] is base_tags
+
+    metrics.gauge("lag", 5, tags={})
+    backend.gauge.assert_called_once_with(key="consumer.lag", value=5, tags={"a": "1"})
+    assert backend.gauge.call_args.kwargs["tags"] is base_tags
+
+    metrics.timing("latency", 10, tags={"a": "2", "b": "3"})
+    backend.timing.assert_called_once_with(
+        key="consumer.latency", value=10, tags={"a": "2", "b": "3"}
+    )
+    assert base_tags == {"a": "1"}
+
+
+def test_metrics_wrapper_without_name_or_tags():
+    backend = Mock()
+    metrics = MetricsWrapper(backend)
+
+    metrics.increment("processed", tags={"b": "3"})
+    backend.incr.assert_called_once_with(key="processed", amount=1, tags={"b": "3"})
@@ -417,6 +417,25 @@ class OAuthTokenRefreshTokenTest(TestCase):
         assert resp.status_code == 400
         assert json.loads(resp.content) == {"error": "invalid_grant"}
 
+    def test_refresh_token_of_other_application(self):
+        self.login_as(self.user)
+        other_application = ApiApplication.objects.create(
+            owner=self.user, redirect_uris="https://example.com"
+        )
+
+        resp = self.client.post(
+            self.path,
+            {
+                "grant_type": "refresh_token",
+                "client_id": other_application.client_id,
+                "refresh_token": self.token.refresh_token,
+                "client_secret": other_application.client_secret,
+            },
+        )
+
+        assert resp.status_code == 400
+        assert json.loads(resp.content) == {"error": "invalid_grant"}
+
     def test_valid_params(self):
         self.login_as(self.user)
 